@@ -0,0 +1,197 @@
+import json
+import logging
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+# Admission control for the booking API. Everything here runs before the view
+# touches the DB: per-user and per-IP token buckets, then a cap on how many
+# booking requests may be in flight for one turf. Buckets live in the
+# BOOKING_ADMISSION_CACHE cache (Redis) so all workers see the same limits.
+# Without one, or if it errors out, each process keeps its own buckets rather
+# than letting the storm through; rate limiting never goes through the DB.
+
+KEY_PREFIX = "admission"
+
+logger = logging.getLogger(__name__)
+
+_local_lock = threading.Lock()
+_local_buckets = {}
+_local_inflight = {}
+_local_shed = {}
+
+
+def _cache():
+    alias = settings.BOOKING_ADMISSION_CACHE
+    return caches[alias] if alias else None
+
+
+def warn_if_unshared():
+    if _cache() is None and not settings.DEBUG:
+        logger.warning(
+            "BOOKING_ADMISSION_CACHE is not set (no REDIS_URL): booking rate limits and "
+            "per-turf concurrency caps are enforced per worker process, not across workers"
+        )
+
+
+def _take_token_local(key, rate, burst, now):
+    with _local_lock:
+        tokens, updated = _local_buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens < 1:
+            _local_buckets[key] = (tokens, now)
+            return False
+        _local_buckets[key] = (tokens - 1, now)
+        return True
+
+
+def take_token(key, rate, burst):
+    """Spend one token from the bucket at ``key``; False when it is empty.
+
+    ``rate`` is tokens refilled per second, ``burst`` the bucket size. The
+    cache read-modify-write is not atomic across workers, which at worst lets
+    a few extra requests through under contention.
+    """
+    now = time.time()
+    key = f"{KEY_PREFIX}:bucket:{key}"
+    cache = _cache()
+    if cache is None:
+        return _take_token_local(key, rate, burst, now)
+    ttl = int(burst / rate) + 1
+    try:
+        tokens, updated = cache.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens < 1:
+            cache.set(key, (tokens, now), ttl)
+            return False
+        cache.set(key, (tokens - 1, now), ttl)
+        return True
+    except Exception:
+        return _take_token_local(key, rate, burst, now)
+
+
+def _acquire_local(key, limit):
+    with _local_lock:
+        if _local_inflight.get(key, 0) >= limit:
+            return False
+        _local_inflight[key] = _local_inflight.get(key, 0) + 1
+        return True
+
+
+def _release_local(key):
+    with _local_lock:
+        if _local_inflight.get(key, 0) > 0:
+            _local_inflight[key] -= 1
+
+
+def acquire_turf(turf_id):
+    key = f"{KEY_PREFIX}:inflight:{turf_id}"
+    limit = settings.BOOKING_TURF_CONCURRENCY
+    cache = _cache()
+    if cache is None:
+        return _acquire_local(key, limit)
+    try:
+        cache.add(key, 0, settings.BOOKING_INFLIGHT_TTL)
+        if cache.incr(key) > limit:
+            cache.decr(key)
+            return False
+        return True
+    except Exception:
+        return _acquire_local(key, limit)
+
+
+def release_turf(turf_id):
+    key = f"{KEY_PREFIX}:inflight:{turf_id}"
+    cache = _cache()
+    if cache is None:
+        _release_local(key)
+        return
+    try:
+        cache.decr(key)
+    except ValueError:  # key expired while the request was running
+        pass
+    except Exception:
+        _release_local(key)
+
+
+def _record_shed_local(reason):
+    with _local_lock:
+        _local_shed[reason] = _local_shed.get(reason, 0) + 1
+
+
+def record_shed(reason):
+    cache = _cache()
+    if cache is None:
+        _record_shed_local(reason)
+        return
+    key = f"{KEY_PREFIX}:shed:{reason}"
+    try:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+    except Exception:
+        _record_shed_local(reason)
+
+
+def shed_counts():
+    """Requests rejected so far, by reason, from the cache plus local fallback."""
+    reasons = ("user_rate", "ip_rate", "turf_concurrency")
+    cache = _cache()
+    try:
+        counts = cache.get_many([f"{KEY_PREFIX}:shed:{reason}" for reason in reasons]) if cache else {}
+    except Exception:
+        counts = {}
+    return {
+        reason: counts.get(f"{KEY_PREFIX}:shed:{reason}", 0) + _local_shed.get(reason, 0)
+        for reason in reasons
+    }
+
+
+def client_ip(req):
+    if settings.BOOKING_TRUST_X_FORWARDED_FOR:
+        forwarded = req.META.get("HTTP_X_FORWARDED_FOR")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return req.META.get("REMOTE_ADDR", "")
+
+
+def _reject(reason, retry_after):
+    record_shed(reason)
+    response = JsonResponse({"errors": ["Too many booking requests, please try again shortly"]}, status=429)
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def admission_control(view):
+    """Shed excess booking requests with a 429 before any DB work is done.
+
+    The JSON body is parsed once here to find the turf and kept on
+    ``req.booking_data`` for the view to reuse.
+    """
+    @wraps(view)
+    def wrapper(req, *args, **kwargs):
+        if req.user.is_authenticated and not take_token(
+            f"user:{req.user.pk}", settings.BOOKING_USER_RATE, settings.BOOKING_USER_BURST
+        ):
+            return _reject("user_rate", int(1 / settings.BOOKING_USER_RATE) + 1)
+        if not take_token(f"ip:{client_ip(req)}", settings.BOOKING_IP_RATE, settings.BOOKING_IP_BURST):
+            return _reject("ip_rate", int(1 / settings.BOOKING_IP_RATE) + 1)
+
+        try:
+            req.booking_data = json.loads(req.body.decode('utf-8'))
+            turf_id = int(req.booking_data.get('turf_id'))
+        except (ValueError, TypeError, AttributeError):
+            # malformed requests are cheap to reject, let the validator do it
+            return view(req, *args, **kwargs)
+
+        if not acquire_turf(turf_id):
+            return _reject("turf_concurrency", 1)
+        try:
+            return view(req, *args, **kwargs)
+        finally:
+            release_turf(turf_id)
+
+    return wrapper
@@ -1,3 +1,68 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from core.models import User
+from host import availability
+from host.models import Booking, Turf, Venue
+from .utils import BookingValidation
+
+
+class BookingValidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create(username="host", is_host=True)
+        cls.player = User.objects.create(username="player")
+        cls.venue = Venue.objects.create(name="Arena", host=cls.host)
+        cls.turf = Turf.objects.create(venue=cls.venue, name="5-a-side", price_per_hr=600)
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(
+            AVAILABILITY_SNAPSHOT_PATH=f"{tmp.name}/availability.snapshot", EVENT_LOG_DIR=tmp.name,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        availability._snapshot = None
+        self.addCleanup(setattr, availability, "_snapshot", None)
+        self.tomorrow = (timezone.localtime() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def validate(self, start, duration=60):
+        req = RequestFactory().post("/api/booking/", json.dumps({
+            "venue_id": self.venue.pk, "turf_id": self.turf.pk,
+            "start_date": start.strftime("%Y-%m-%dT%H:%M"), "duration": duration,
+        }), content_type="application/json")
+        req.user = self.player
+        return BookingValidation(req).validate()
+
+    def test_valid_booking(self):
+        result = self.validate(self.tomorrow, duration=90)
+        self.assertTrue(result["is_valid"])
+        self.assertEqual(result["start_time"], self.tomorrow)
+        self.assertEqual(result["end_time"], self.tomorrow + timedelta(minutes=90))
+
+    def test_rejects_past_start(self):
+        result = self.validate(self.tomorrow - timedelta(days=2))
+        self.assertEqual(result, {"is_valid": False, "error": "Booking cannot be in the past"})
+
+    def test_rejects_unaligned_start(self):
+        result = self.validate(self.tomorrow + timedelta(minutes=15))
+        self.assertEqual(result, {"is_valid": False, "error": "Start time must be on the hour or half-hour"})
+
+    def test_rejects_bad_duration(self):
+        for duration in (30, 75, "abc"):
+            with self.subTest(duration=duration):
+                self.assertFalse(self.validate(self.tomorrow, duration=duration)["is_valid"])
+
+    def test_rejects_overlap(self):
+        Booking.objects.create(
+            turf=self.turf, user=self.host, total_price=600,
+            start_datetime=self.tomorrow + timedelta(minutes=30), end_datetime=self.tomorrow + timedelta(minutes=90),
+        )
+        result = self.validate(self.tomorrow)
+        self.assertEqual(result, {"is_valid": False, "error": "The selected time slot is not available"})
+        self.assertTrue(self.validate(self.tomorrow + timedelta(minutes=90))["is_valid"])
@@ -3,6 +3,9 @@ from .views import *
 
 urlpatterns = [
     path("handle_booking/", handle_booking, name="handle_booking"),
+    path("home/", home_feed, name="home_feed"), #?open_tonight=1&limit=20
+    path("admission_stats/", admission_stats, name="admission_stats"),
+    path("turf/<int:turf_id>/availability/", turf_availability, name="turf_availability"), #?date=2025-01-31
 ]
 
 app_name = 'api'
\ No newline at end of file
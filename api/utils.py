@@ -1,6 +1,9 @@
-from datetime import datetime, timedelta
 from host.models import Turf, Booking
+from host import slots
+from host.availability import get_snapshot
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from core import events
 import json
 
 class BookingValidation:
@@ -9,7 +12,9 @@ class BookingValidation:
 
     def validate(self):
         print(f"Request body: {self.req.body}")
-        data = json.loads(self.req.body.decode('utf-8'))
+        data = getattr(self.req, 'booking_data', None)
+        if data is None:
+            data = json.loads(self.req.body.decode('utf-8'))
         print(f"Data: {data}")
         venue_id = data.get('venue_id')
         turf_id = data.get('turf_id')
@@ -18,7 +23,7 @@ class BookingValidation:
         print(f"venue_id: {venue_id}, turf_id: {turf_id}, start_time_str: {start_time_str}, duration: {data.get('duration')}")
         try:
             duration_mins = int(data.get('duration'))
-            if duration_mins < 60 or duration_mins % 30 != 0:
+            if duration_mins < 60 or duration_mins % slots.SLOT_MINUTES != 0:
                 return {"is_valid": False, "error": "Duration must be at least 60 minutes and in increments of 30 minutes"}
         except (ValueError, TypeError):
             return {"is_valid": False, "error": "Invalid duration format"}
@@ -28,7 +33,13 @@ class BookingValidation:
             return validation_result
 
         start_time = validation_result["start_time"]
-        end_time = start_time + timedelta(minutes=duration_mins)
+        if not slots.is_aligned(start_time):
+            return {"is_valid": False, "error": "Start time must be on the hour or half-hour"}
+        start_slot = slots.to_slot(start_time)
+        if start_slot < slots.to_slot_ceil(timezone.now()):
+            return {"is_valid": False, "error": "Booking cannot be in the past"}
+        requested = slots.ranges([(start_slot, start_slot + duration_mins // slots.SLOT_MINUTES)])
+        end_time = slots.from_slot(requested[1])
 
         validation_result = self._validate_turf(venue_id, turf_id)
         if not validation_result["is_valid"]:
@@ -36,8 +47,12 @@ class BookingValidation:
 
         turf = validation_result["turf"]
 
-        validation_result = self._validate_availability(turf, start_time, end_time)
+        validation_result = self._validate_availability(turf, requested)
         if not validation_result["is_valid"]:
+            events.record(
+                events.AVAILABILITY_REJECTED, venue_id=turf.venue_id, turf_id=turf.id,
+                user_id=self.req.user.pk, start=start_time, end=end_time, reason=validation_result["error"],
+            )
             return validation_result
 
         return {"is_valid": True, "start_time": start_time, "end_time": end_time, "turf": turf}
@@ -55,8 +70,8 @@ class BookingValidation:
             errors.append("Missing duration")
         try:
             print(f"start_time_str: {start_time_str}")
-            start_time = datetime.strptime(start_time_str, '%Y-%m-%dT%H:%M')
-        except ValueError:
+            start_time = slots.parse_local(start_time_str)
+        except (ValueError, TypeError):
             errors.append("Invalid start time format")
 
         if errors:
@@ -72,11 +87,21 @@ class BookingValidation:
 
         return {"is_valid": True, "turf": turf}
 
-    def _validate_availability(self, turf, start_time, end_time):
+    def _validate_availability(self, turf, requested):
+        # a slot the shared snapshot has as booked is reliably taken (any
+        # change to the turf since the build makes it return None instead),
+        # so those requests are rejected without touching the DB
+        start, end = requested
+        snapshot = get_snapshot()
+        for day_start in range(start - start % slots.SLOTS_PER_DAY, end, slots.SLOTS_PER_DAY):
+            bitmap = snapshot.day_bitmap(turf.id, slots.day_of(day_start))
+            if bitmap is not None and slots.overlaps(slots.from_bitmap(bitmap, day_start), requested):
+                return {"is_valid": False, "error": "The selected time slot is not available"}
+
         overlapping_bookings = Booking.objects.filter(
             turf=turf,
-            start_datetime__lt=end_time,
-            end_datetime__gt=start_time
+            start_datetime__lt=slots.from_slot(end),
+            end_datetime__gt=slots.from_slot(start)
         )
 
         if overlapping_bookings.exists():
@@ -1,8 +1,17 @@
+from datetime import datetime
 from django.http import JsonResponse
+from django.utils import timezone
+from django.conf import settings
 from .utils import BookingValidation
-from host.models import Booking
+from .admission import admission_control, shed_counts
+from django.db.models import Count, Max
+from host.models import Booking, Turf
+from host.availability import get_booked_slots
+from host.slots import SLOT_MINUTES
+from core.conditional import not_modified, set_validators, stamp
 
 # Create your views here.
+@admission_control
 def handle_booking(req):
     validator = BookingValidation(req)
     validation_result = validator.validate()
@@ -19,3 +28,82 @@ def handle_booking(req):
     booking.save()
     
     return JsonResponse({"message": "Booking successfully!", })
+
+
+def turf_availability(req, turf_id):
+    try:
+        turf = Turf.objects.get(id=turf_id)
+    except Turf.DoesNotExist:
+        return JsonResponse({"errors": ["Turf does not exist"]}, status=404)
+
+    date_str = req.GET.get('date')
+    try:
+        day = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else timezone.localdate()
+    except ValueError:
+        return JsonResponse({"errors": ["Invalid date format"]}, status=400)
+
+    version = stamp("availability", turf.id, turf.booking_version, day)
+    cached = not_modified(req, version)
+    if cached:
+        return cached
+
+    booked = get_booked_slots(turf, day)
+    response = JsonResponse({
+        "turf_id": turf.id,
+        "date": day.isoformat(),
+        "slot_minutes": SLOT_MINUTES,
+        "booked_slots": booked,
+    })
+    return set_validators(response, version, public=True, max_age=settings.AVAILABILITY_MAX_AGE)
+
+
+def admission_stats(req):
+    if not req.user.is_staff:
+        return JsonResponse({"errors": ["Forbidden"]}, status=403)
+    return JsonResponse({"shed": shed_counts()})
+
+
+def home_feed(req):
+    open_tonight = req.GET.get('open_tonight') == '1'
+    try:
+        limit = int(req.GET.get('limit', 20))
+    except ValueError:
+        return JsonResponse({"errors": ["Invalid limit"]}, status=400)
+    if limit < 1:
+        return JsonResponse({"errors": ["Invalid limit"]}, status=400)
+    limit = min(limit, 100)
+
+    state = Turf.objects.aggregate(
+        count=Count('id'),
+        updated=Max('updated_at'),
+        venues_updated=Max('venue__updated_at'),
+        availability_updated=Max('availability__updated_at'),
+    )
+    version = stamp(
+        "home", open_tonight, limit, state['count'], state['updated'] or 0,
+        state['venues_updated'] or 0, state['availability_updated'] or 0,
+    )
+    cached = not_modified(req, version)
+    if cached:
+        return cached
+
+    turfs = Turf.objects.select_related('venue', 'availability').filter(
+        availability__next_available_at__isnull=False
+    ).order_by('availability__next_available_at', 'id')
+    if open_tonight:
+        turfs = turfs.filter(availability__open_tonight=True)
+    response = JsonResponse({
+        "turfs": [
+            {
+                "venue_id": turf.venue_id,
+                "venue": turf.venue.name,
+                "turf_id": turf.id,
+                "turf": turf.name,
+                "price_per_hr": str(turf.price_per_hr),
+                "next_available_at": timezone.localtime(turf.availability.next_available_at).isoformat(),
+                "open_tonight": turf.availability.open_tonight,
+            }
+            for turf in turfs[:limit]
+        ],
+    })
+    return set_validators(response, version, public=True, max_age=settings.AVAILABILITY_MAX_AGE)
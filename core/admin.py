@@ -1,6 +1,48 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import User, Order
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .models import User, Order, Job
 
-# Register your models here.
-admin.site.register(User)
-admin.site.register(Order)
\ No newline at end of file
+
+class EstimatedCountPaginator(Paginator):
+    # unfiltered changelists on big tables use the planner's row estimate instead of COUNT(*)
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if not queryset.query.where and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    list_display = ('username', 'email', 'is_host', 'is_staff')
+    list_filter = ('is_host', 'is_staff')
+    search_fields = ('username', 'email')
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'payment_id', 'user', 'booking', 'amount', 'order_timestamp')
+    list_select_related = ('user', 'booking__turf__venue')
+    search_fields = ('=payment_id',)
+    date_hierarchy = 'order_timestamp'
+    raw_id_fields = ('booking',)
+    autocomplete_fields = ('user',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'run_after', 'duration_ms')
+    list_filter = ('status', 'name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
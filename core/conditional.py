@@ -0,0 +1,27 @@
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+# Conditional GET helpers. Views build a cheap version string from
+# updated_at / booking_version columns, check it before doing any rendering
+# and stamp it on the full response otherwise.
+
+
+def not_modified(req, version, last_modified=None):
+    """A 304 (or 412) response if the client's copy is still current, else None."""
+    return get_conditional_response(
+        req,
+        etag=quote_etag(version),
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_validators(response, version, last_modified=None, **cache_control):
+    response["ETag"] = quote_etag(version)
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, **cache_control)
+    return response
+
+
+def stamp(*parts):
+    return "-".join(str(part.timestamp()) if hasattr(part, "timestamp") else str(part) for part in parts)
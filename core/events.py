@@ -0,0 +1,131 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+# Append-only booking event log for analytics. Events are buffered in process
+# and appended in batches to one JSONL segment per process per day under
+# EVENT_LOG_DIR, so nothing here touches the transactional tables. A daemon
+# thread flushes every EVENT_LOG_FLUSH_INTERVAL so quiet processes do not sit
+# on events the export is waiting for.
+# ``manage.py export_events`` compacts a day's segments into a CSV partition.
+
+FIELDS = ["ts", "type", "venue_id", "turf_id", "user_id", "booking_id", "order_id", "start", "end", "amount", "reason"]
+
+BOOKING_CREATED = "booking_created"
+BOOKING_CANCELLED = "booking_cancelled"
+ORDER_PAID = "order_paid"
+AVAILABILITY_REJECTED = "availability_rejected"
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_buffer = []
+_last_flush = time.monotonic()
+_retry_at = 0.0
+_flusher = None
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return timezone.localtime(value).isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(settings.EVENT_LOG_FLUSH_INTERVAL)
+        flush()
+
+
+def _ensure_flusher():
+    global _flusher
+    # started lazily, and again in a forked worker where the parent's thread is gone
+    if _flusher is None or not _flusher.is_alive():
+        _flusher = threading.Thread(target=_flush_periodically, name="event-log-flush", daemon=True)
+        _flusher.start()
+
+
+def record(event_type, **fields):
+    """Buffer one event; flushes when the batch is full or old enough."""
+    event = {"ts": timezone.localtime().isoformat(), "type": event_type}
+    event.update((key, _value(value)) for key, value in fields.items() if key in FIELDS)
+    with _lock:
+        _ensure_flusher()
+        _buffer.append(event)
+        now = time.monotonic()
+        due = now >= _retry_at and (
+            len(_buffer) >= settings.EVENT_LOG_BATCH_SIZE
+            or now - _last_flush >= settings.EVENT_LOG_FLUSH_INTERVAL
+        )
+    if due:
+        flush()
+
+
+def record_on_commit(event_type, **fields):
+    transaction.on_commit(lambda: record(event_type, **fields))
+
+
+def segment_dir(day):
+    return os.path.join(str(settings.EVENT_LOG_DIR), str(day))
+
+
+def _append(day, day_events):
+    directory = segment_dir(day)
+    os.makedirs(directory, exist_ok=True)
+    lines = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in day_events)
+    # one write per batch to a file only this process appends to
+    with open(os.path.join(directory, f"events-{os.getpid()}.jsonl"), "a", encoding="utf-8") as fh:
+        fh.write(lines)
+
+
+def flush():
+    """Write buffered events out. Never raises: analytics must not fail a booking.
+
+    Batches that cannot be written go back to the front of the buffer for the
+    next flush; past EVENT_LOG_MAX_BUFFER the oldest are dropped, loudly.
+    """
+    global _last_flush, _retry_at
+    with _lock:
+        events = _buffer[:]
+        _buffer.clear()
+        _last_flush = time.monotonic()
+    if not events:
+        return
+
+    by_day = {}
+    for event in events:
+        by_day.setdefault(event["ts"][:10], []).append(event)
+    failed = []
+    for day, day_events in by_day.items():
+        try:
+            _append(day, day_events)
+        except Exception:
+            logger.exception("Could not write %d event(s) for %s, keeping them for the next flush", len(day_events), day)
+            failed.extend(day_events)
+    if not failed:
+        return
+
+    with _lock:
+        _buffer[:0] = failed
+        dropped = max(0, len(_buffer) - settings.EVENT_LOG_MAX_BUFFER)
+        del _buffer[:dropped]
+        _retry_at = time.monotonic() + settings.EVENT_LOG_FLUSH_INTERVAL
+    if dropped:
+        logger.error("Event log buffer full, dropped the %d oldest event(s)", dropped)
+
+
+atexit.register(flush)
@@ -0,0 +1,126 @@
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+# Lightweight DB-backed job queue. Request code calls ``enqueue`` and returns;
+# ``manage.py run_jobs`` claims due jobs in batches and runs the handlers
+# registered with ``@register_job`` in each app's ``tasks`` module.
+
+_handlers = {}
+
+
+def register_job(name, batch=False):
+    """Register a handler for jobs called ``name``.
+
+    Plain handlers get one payload dict per call. ``batch=True`` handlers get
+    the list of payloads claimed together, so they can share queries. A batch
+    handler may return ``{index: error}`` for the payloads that failed; only
+    those jobs are retried, the rest are marked done. Raising fails the whole
+    batch.
+    """
+    def decorator(func):
+        _handlers[name] = (func, batch)
+        return func
+    return decorator
+
+
+def enqueue(name, **payload):
+    """Queue a job once the current transaction commits (immediately outside one)."""
+    transaction.on_commit(lambda: Job.objects.create(name=name, payload=payload))
+
+
+def load_handlers():
+    autodiscover_modules("tasks")
+    return _handlers
+
+
+def reclaim_stale(now):
+    """Put RUNNING jobs whose worker died back in the queue, counting the lost run as an attempt."""
+    stale = Job.objects.filter(
+        status=Job.RUNNING, started_at__lt=now - timedelta(seconds=settings.JOB_STALE_TIMEOUT)
+    )
+    error = f"Still running after {settings.JOB_STALE_TIMEOUT}s, worker presumed dead"
+    stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS - 1).update(
+        status=Job.FAILED, attempts=F("attempts") + 1, finished_at=now, last_error=error
+    )
+    stale.update(status=Job.PENDING, attempts=F("attempts") + 1, run_after=now, last_error=error)
+
+
+def claim_batch(size):
+    now = timezone.now()
+    with transaction.atomic():
+        reclaim_stale(now)
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.PENDING, run_after__lte=now)
+            .order_by("run_after", "id")[:size]
+        )
+        Job.objects.filter(id__in=[job.id for job in jobs]).update(status=Job.RUNNING, started_at=now)
+    return jobs
+
+
+def _finish(jobs, duration_ms, error=None):
+    now = timezone.now()
+    for job in jobs:
+        job.attempts += 1
+        job.finished_at = now
+        job.duration_ms = duration_ms
+        if error is None:
+            job.status = Job.DONE
+            job.last_error = ""
+        elif job.attempts < settings.JOB_MAX_ATTEMPTS:
+            job.status = Job.PENDING
+            job.run_after = now + timedelta(seconds=settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1))
+            job.last_error = error
+        else:
+            job.status = Job.FAILED
+            job.last_error = error
+    Job.objects.bulk_update(jobs, ["attempts", "finished_at", "duration_ms", "status", "run_after", "last_error"])
+
+
+def run_batch(size):
+    """Claim and run up to ``size`` due jobs; returns {name: (count, total_ms)}."""
+    handlers = load_handlers()
+    jobs = claim_batch(size)
+
+    by_name = {}
+    for job in jobs:
+        by_name.setdefault(job.name, []).append(job)
+
+    stats = {}
+    for name, group in by_name.items():
+        if name not in handlers:
+            _finish(group, 0, error=f"No handler registered for {name}")
+            continue
+        func, batch = handlers[name]
+        calls = [group] if batch else [[job] for job in group]
+        for call in calls:
+            started = time.monotonic()
+            failures = {}
+            error = None
+            try:
+                if batch:
+                    failures = func([job.payload for job in call]) or {}
+                else:
+                    func(call[0].payload)
+            except Exception:
+                error = traceback.format_exc()
+            elapsed_ms = int((time.monotonic() - started) * 1000)
+            duration_ms = elapsed_ms // len(call)
+            if error is not None:
+                _finish(call, duration_ms, error=error)
+            else:
+                _finish([job for index, job in enumerate(call) if index not in failures], duration_ms)
+                for index, job_error in failures.items():
+                    _finish([call[index]], duration_ms, error=job_error)
+            count, total_ms = stats.get(name, (0, 0))
+            stats[name] = (count + len(call), total_ms + elapsed_ms)
+    return stats
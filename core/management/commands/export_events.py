@@ -0,0 +1,42 @@
+import csv
+import glob
+import gzip
+import json
+import os
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.events import FIELDS, segment_dir
+
+
+class Command(BaseCommand):
+    help = "Compact one day of booking event log segments into a gzipped CSV partition."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--day", help="YYYY-MM-DD, defaults to yesterday.")
+        parser.add_argument("--output", default=None, help="Partition root, defaults to EVENT_LOG_DIR/exports.")
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options["day"]) if options["day"] else timezone.localdate() - timedelta(days=1)
+        except ValueError:
+            raise CommandError("Invalid --day, expected YYYY-MM-DD")
+
+        events = []
+        for path in glob.glob(os.path.join(segment_dir(day), "events-*.jsonl")):
+            with open(path, encoding="utf-8") as fh:
+                events.extend(json.loads(line) for line in fh if line.strip())
+        events.sort(key=lambda event: event["ts"])
+
+        output = options["output"] or os.path.join(str(settings.EVENT_LOG_DIR), "exports")
+        partition = os.path.join(output, f"day={day.isoformat()}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, "events.csv.gz")
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(events)
+        self.stdout.write(f"Exported {len(events)} event(s) to {path}")
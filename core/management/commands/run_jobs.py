@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.jobs import run_batch
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (booking confirmations, order reconciliation, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.JOB_BATCH_SIZE)
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Run a single batch and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            stats = run_batch(options["batch_size"])
+            for name, (count, total_ms) in stats.items():
+                self.stdout.write(f"{name}: {count} job(s) in {total_ms}ms ({total_ms / count:.1f}ms/job)")
+            if options["once"]:
+                break
+            if not stats:
+                time.sleep(options["sleep"])
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="amount",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=6),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="order_timestamp",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="payment_id",
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
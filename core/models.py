@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 class User(AbstractUser):
     is_host = models.BooleanField(default=False)
@@ -12,11 +13,55 @@ class User(AbstractUser):
 class Order(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     booking = models.ForeignKey("host.Booking", on_delete=models.CASCADE)
-    payment_id = models.CharField(max_length=100)
-    order_timestamp = models.DateTimeField(auto_now_add=True)
+    payment_id = models.CharField(max_length=100, db_index=True)
+    order_timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
     signature = models.CharField(max_length=255, blank=True, null=True)
     amount = models.DecimalField(max_digits=6, decimal_places=2)
     
     def __str__(self):
         return f"{self.user.username} - {self.booking.turf.venue.name} - {self.booking.turf.name} - {self.booking.start_datetime} to {self.booking.end_datetime}"
 
+    def save(self, *args, **kwargs):
+        from .jobs import enqueue
+        from . import events
+        is_new = self.pk is None
+        super().save(*args, **kwargs)
+        if is_new:
+            enqueue("order.created", order_id=self.pk)
+            events.record_on_commit(
+                events.ORDER_PAID, order_id=self.pk, booking_id=self.booking_id, user_id=self.user_id, amount=self.amount,
+            )
+
+
+class Job(models.Model):
+    # background work queued from booking/order writes, run by `manage.py run_jobs`
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    duration_ms = models.PositiveIntegerField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
@@ -0,0 +1,54 @@
+import logging
+import traceback
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from host.models import Booking
+from .jobs import register_job
+from .models import Order
+
+logger = logging.getLogger(__name__)
+
+
+@register_job("booking.created", batch=True)
+def send_booking_confirmations(payloads):
+    bookings = Booking.objects.select_related("user", "turf__venue").in_bulk(
+        [payload["booking_id"] for payload in payloads]
+    )
+    failures = {}
+    # one SMTP connection for the batch, but each message fails (and is retried) on its own
+    # so a bad address or dropped connection never re-sends the confirmations that went out
+    with get_connection() as connection:
+        for index, payload in enumerate(payloads):
+            booking = bookings.get(payload["booking_id"])
+            if booking is None or not booking.user.email:
+                continue
+            message = EmailMessage(
+                "Your SportsHunt booking is confirmed",
+                f"{booking.turf.venue.name} -> {booking.turf.name}\n"
+                f"{timezone.localtime(booking.start_datetime):%d %b %Y %H:%M} to {timezone.localtime(booking.end_datetime):%H:%M}\n"
+                f"Total: {booking.total_price}",
+                settings.DEFAULT_FROM_EMAIL,
+                [booking.user.email],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception:
+                failures[index] = traceback.format_exc()
+    return failures
+
+
+@register_job("order.created", batch=True)
+def reconcile_orders(payloads):
+    orders = Order.objects.select_related("booking").filter(
+        id__in=[payload["order_id"] for payload in payloads]
+    )
+    for order in orders:
+        if order.amount != order.booking.total_price:
+            logger.warning(
+                "Order %s (payment %s) amount %s does not match booking %s total %s",
+                order.pk, order.payment_id, order.amount, order.booking_id, order.booking.total_price,
+            )
@@ -1,3 +1,140 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from host.availability import refresh_next_available
+from host.models import Turf, Venue
+from . import jobs
+from .models import Job, User
+
+
+@override_settings(JOB_MAX_ATTEMPTS=3, JOB_RETRY_BACKOFF=10, JOB_STALE_TIMEOUT=60)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.register("test.ok", lambda payload: self.calls.append(payload))
+        self.register("test.fail", self.fail_job)
+        self.register("test.batch", self.batch_job, batch=True)
+
+    def register(self, name, func, batch=False):
+        jobs.register_job(name, batch=batch)(func)
+        self.addCleanup(jobs._handlers.pop, name, None)
+
+    def fail_job(self, payload):
+        raise RuntimeError("boom")
+
+    def batch_job(self, payloads):
+        self.calls.append(payloads)
+        return {index: "bad payload" for index, payload in enumerate(payloads) if payload.get("bad")}
+
+    def due(self, name, **fields):
+        fields.setdefault("run_after", timezone.now() - timedelta(seconds=1))
+        return Job.objects.create(name=name, **fields)
+
+    def test_enqueue_waits_for_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            jobs.enqueue("test.ok", booking_id=1)
+            self.assertFalse(Job.objects.exists())
+        self.assertEqual(len(callbacks), 1)
+        job = Job.objects.get()
+        self.assertEqual((job.name, job.payload, job.status), ("test.ok", {"booking_id": 1}, Job.PENDING))
+
+    def test_successful_job_is_done(self):
+        job = self.due("test.ok", payload={"n": 1})
+        stats = jobs.run_batch(10)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), (Job.DONE, 1, ""))
+        self.assertEqual(self.calls, [{"n": 1}])
+        self.assertEqual(stats["test.ok"][0], 1)
+
+    def test_jobs_not_yet_due_are_left_alone(self):
+        job = self.due("test.ok", run_after=timezone.now() + timedelta(minutes=5))
+        jobs.run_batch(10)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(self.calls, [])
+
+    def test_failures_back_off_exponentially(self):
+        for attempts, delay in ((0, 10), (1, 20)):
+            with self.subTest(attempts=attempts):
+                job = self.due("test.fail", attempts=attempts)
+                before = timezone.now()
+                jobs.run_batch(10)
+                after = timezone.now()
+                job.refresh_from_db()
+                self.assertEqual((job.status, job.attempts), (Job.PENDING, attempts + 1))
+                self.assertIn("RuntimeError: boom", job.last_error)
+                self.assertGreaterEqual(job.run_after, before + timedelta(seconds=delay))
+                self.assertLessEqual(job.run_after, after + timedelta(seconds=delay))
+
+    def test_failed_after_max_attempts(self):
+        job = self.due("test.fail", attempts=2)
+        jobs.run_batch(10)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 3))
+
+    def test_unknown_job_name_fails(self):
+        job = self.due("test.missing")
+        jobs.run_batch(10)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.last_error, "No handler registered for test.missing")
+
+    def test_batch_failures_are_per_payload(self):
+        good, bad, other = (self.due("test.batch", payload=payload) for payload in ({}, {"bad": True}, {}))
+        jobs.run_batch(10)
+        self.assertEqual(len(self.calls), 1)
+        for job in (good, bad, other):
+            job.refresh_from_db()
+        self.assertEqual([good.status, bad.status, other.status], [Job.DONE, Job.PENDING, Job.DONE])
+        self.assertEqual(bad.last_error, "bad payload")
+        self.assertEqual(bad.attempts, 1)
+
+    def test_batch_exception_fails_whole_batch(self):
+        self.register("test.batch", lambda payloads: 1 / 0, batch=True)
+        created = [self.due("test.batch") for _ in range(2)]
+        jobs.run_batch(10)
+        self.assertEqual(
+            list(Job.objects.filter(pk__in=[job.pk for job in created]).values_list("status", flat=True)),
+            [Job.PENDING, Job.PENDING],
+        )
+
+    def test_stale_running_jobs_are_requeued(self):
+        now = timezone.now()
+        stale = Job.objects.create(name="test.ok", status=Job.RUNNING, started_at=now - timedelta(seconds=120))
+        exhausted = Job.objects.create(
+            name="test.ok", status=Job.RUNNING, attempts=2, started_at=now - timedelta(seconds=120),
+        )
+        fresh = Job.objects.create(name="test.ok", status=Job.RUNNING, started_at=now - timedelta(seconds=10))
+        jobs.reclaim_stale(now)
+        for job in (stale, exhausted, fresh):
+            job.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts, stale.run_after), (Job.PENDING, 1, now))
+        self.assertIn("worker presumed dead", stale.last_error)
+        self.assertEqual((exhausted.status, exhausted.attempts), (Job.FAILED, 3))
+        self.assertEqual((fresh.status, fresh.attempts), (Job.RUNNING, 0))
+
+    def test_claim_batch_picks_up_stale_jobs(self):
+        stale = Job.objects.create(
+            name="test.ok", status=Job.RUNNING, started_at=timezone.now() - timedelta(seconds=120),
+        )
+        jobs.run_batch(10)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), (Job.DONE, 2))
+
+
+class IndexConditionalTests(TestCase):
+    def test_deleting_a_turf_changes_the_etag(self):
+        host = User.objects.create(username="host", is_host=True)
+        venue = Venue.objects.create(name="Arena", host=host)
+        turfs = [Turf.objects.create(venue=venue, name=name, price_per_hr=600) for name in ("5-a-side", "7-a-side")]
+        refresh_next_available([turf.pk for turf in turfs])
+
+        etag = self.client.get(reverse('core:index'))["ETag"]
+        self.assertEqual(self.client.get(reverse('core:index'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Turf.objects.filter(pk=turfs[0].pk).delete()  # not the most recently updated
+        response = self.client.get(reverse('core:index'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
@@ -4,12 +4,37 @@ from .models import User
 from django.contrib.auth import logout 
 from django.urls import reverse
 from django.conf import settings
+from django.utils import timezone
+from django.db.models import Count, F, Max, Min, Q
 from host.models import *
+from host.availability import get_booked_slots
+from host import slots
+from .conditional import not_modified, set_validators, stamp
 
 def index(req):
-    
-    venues = Venue.objects.all()
-    return render(req, 'core/pages/index.html', {'venues': venues})
+    open_tonight = req.GET.get('open_tonight') == '1'
+    state = Venue.objects.aggregate(updated=Max('updated_at'), count=Count('id'))
+    # deleting a turf cascades its TurfAvailability away without touching anything
+    # else, so the turf count is part of the version too
+    turfs = Turf.objects.aggregate(updated=Max('updated_at'), count=Count('id'))
+    availability_updated = TurfAvailability.objects.aggregate(updated=Max('updated_at'))['updated']
+    last_modified = max(filter(None, [state['updated'], turfs['updated'], availability_updated]), default=None)
+    version = stamp(
+        'index', open_tonight, state['count'], state['updated'], turfs['count'], turfs['updated'] or 0,
+        availability_updated or 0,
+    )
+    cached = not_modified(req, version, last_modified)
+    if cached:
+        return cached
+
+    venues = Venue.objects.annotate(
+        next_available_at=Min('turfs__availability__next_available_at'),
+        open_tonight_turfs=Count('turfs__availability', filter=Q(turfs__availability__open_tonight=True)),
+    ).order_by(F('next_available_at').asc(nulls_last=True), 'name')
+    if open_tonight:
+        venues = venues.filter(open_tonight_turfs__gt=0)
+    response = render(req, 'core/pages/index.html', {'venues': venues, 'open_tonight': open_tonight})
+    return set_validators(response, version, last_modified, public=True, max_age=0, must_revalidate=True)
 
 def login_view(req):
     return HttpResponseRedirect(reverse('social:begin', args=['auth0']))
@@ -33,19 +58,45 @@ def venue_filter_view(req):
 
 
 def venue_view(req, venue_id):
-    try:
-        venue = Venue.objects.get(id=venue_id)
-    except Venue.DoesNotExist:
+    state = Venue.objects.filter(id=venue_id).aggregate(
+        updated=Max('updated_at'),
+        turfs_updated=Max('turfs__updated_at'),
+        turf_count=Count('turfs'),
+        availability_updated=Max('turfs__availability__updated_at'),
+    )
+    if state['updated'] is None:
         return render(req, 'core/pages/venue.html', {'error': 'Venue not found'})
-    return render(req, 'core/pages/venue.html', {'venue': venue})
+    last_modified = max(filter(None, [state['updated'], state['turfs_updated'], state['availability_updated']]))
+    version = stamp(
+        'venue', venue_id, state['turf_count'], state['updated'], state['turfs_updated'] or 0, state['availability_updated'] or 0
+    )
+    cached = not_modified(req, version, last_modified)
+    if cached:
+        return cached
+
+    venue = Venue.objects.get(id=venue_id)
+    turfs = venue.turfs.select_related('availability').order_by(
+        F('availability__next_available_at').asc(nulls_last=True), 'name'
+    )
+    response = render(req, 'core/pages/venue.html', {'venue': venue, 'turfs': turfs})
+    return set_validators(response, version, last_modified, public=True, max_age=0, must_revalidate=True)
 
 
 def turf_view(req,venue_id, turf_id):
     try:
-        turf = Turf.objects.get(id=turf_id, venue_id=venue_id)
+        turf = Turf.objects.select_related('venue').get(id=turf_id, venue_id=venue_id)
     except Turf.DoesNotExist:
         return render(req, 'core/pages/turf.html', {'error': 'Turf not found'})
-    return render(req, 'core/pages/turf.html', {'turf': turf})
+    # the page embeds today's bookings and a CSRF token, so it varies by day and user
+    today = timezone.localdate()
+    version = stamp('turf', turf.id, turf.booking_version, turf.updated_at, turf.venue.updated_at, today, req.user.pk)
+    cached = not_modified(req, version)
+    if cached:
+        return cached
+
+    booked_times = [slots.label(slot) for slot in get_booked_slots(turf, today)]
+    response = render(req, 'core/pages/turf.html', {'turf': turf, 'booked_times': booked_times})
+    return set_validators(response, version, private=True, max_age=0, must_revalidate=True)
 
 
 def profile_view(req):
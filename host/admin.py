@@ -1,7 +1,41 @@
 from django.contrib import admin
+from core.admin import EstimatedCountPaginator
 from .models import *
 # Register your models here.
 
-admin.site.register(Venue)
-admin.site.register(Turf)
-admin.site.register(Booking)
\ No newline at end of file
+
+@admin.register(Venue)
+class VenueAdmin(admin.ModelAdmin):
+    list_display = ('name', 'host', 'updated_at')
+    list_select_related = ('host',)
+    search_fields = ('name',)
+    autocomplete_fields = ('host',)
+
+
+@admin.register(Turf)
+class TurfAdmin(admin.ModelAdmin):
+    list_display = ('name', 'venue', 'price_per_hr', 'updated_at')
+    list_select_related = ('venue',)
+    list_filter = ('venue',)
+    search_fields = ('name', 'venue__name')
+    autocomplete_fields = ('venue',)
+    readonly_fields = ('booking_version',)
+
+
+class TurfListFilter(admin.RelatedFieldListFilter):
+    # Turf.__str__ reads the venue, so fetch it with the choices instead of once per turf
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin) or ('venue__name', 'name')
+        return [(turf.pk, str(turf)) for turf in Turf.objects.select_related('venue').order_by(*ordering)]
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ('id', 'turf', 'user', 'start_datetime', 'end_datetime', 'total_price')
+    list_select_related = ('turf__venue', 'user')
+    list_filter = ('turf__venue', ('turf', TurfListFilter))
+    search_fields = ('=user__username', 'turf__name')
+    date_hierarchy = 'start_datetime'
+    autocomplete_fields = ('turf', 'user')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
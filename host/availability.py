@@ -0,0 +1,335 @@
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import slots
+from .slots import SLOTS_PER_DAY, epoch_day
+
+# Snapshot file layout (little endian, all fixed width):
+#
+#   header   magic, generation, built_at, first_day, n_days, n_turfs
+#   turfs    n_turfs x (turf_id, writes) sorted by turf_id
+#   bitmaps  n_turfs x n_days x u64, one bit per half-hour slot (48 used)
+#
+# The refresher rebuilds the whole file and swaps it in with os.replace, so
+# readers never see a half written bitmap. Booking writes in any worker only
+# bump the per turf ``writes`` counter in place; a reader that sees a non-zero
+# counter knows the turf changed since the build and falls back to the DB.
+
+MAGIC = b"BKAVAIL1"
+HEADER = struct.Struct("<8sQQiiI")
+TURF_ENTRY = struct.Struct("<qQ")
+BITMAP = struct.Struct("<Q")
+MIN_BOOKING_SLOTS = 2  # bookings are at least 60 minutes
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_path():
+    return str(settings.AVAILABILITY_SNAPSHOT_PATH)
+
+
+class _SnapshotLock:
+    """Exclusive flock on a sidecar file, shared by the refresher and writers."""
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+class AvailabilitySnapshot:
+    """Read only, memory mapped view of the availability snapshot file.
+
+    One instance is kept per worker process. The mapping is shared with every
+    other process that opens the same file, so reads cost no DB query and no
+    per-worker copy of the data. Any lookup that cannot be answered reliably
+    returns None and the caller is expected to query the DB instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._inode = None
+        self._checked_at = 0.0
+        self._turf_index = {}
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._inode = None
+        self._turf_index = {}
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._map is not None and now - self._checked_at < settings.AVAILABILITY_SNAPSHOT_RECHECK:
+            return
+        self._checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._close()
+            return
+        if stat.st_ino == self._inode:
+            return
+
+        self._close()
+        with open(self.path, "rb") as fh:
+            try:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return
+        if len(mapped) < HEADER.size or mapped[:8] != MAGIC:
+            mapped.close()
+            return
+
+        self._map = mapped
+        self._inode = stat.st_ino
+        n_turfs = self.header()[5]
+        for position in range(n_turfs):
+            turf_id, _ = TURF_ENTRY.unpack_from(mapped, HEADER.size + position * TURF_ENTRY.size)
+            self._turf_index[turf_id] = position
+
+    def header(self):
+        return HEADER.unpack_from(self._map, 0)
+
+    def day_bitmap(self, turf_id, day):
+        """Booked-slot bitmap for ``turf_id`` on local ``day``, or None when stale."""
+        self._refresh()
+        if self._map is None:
+            return None
+
+        _, _, built_at, first_day, n_days, n_turfs = self.header()
+        if time.time() - built_at > settings.AVAILABILITY_SNAPSHOT_MAX_AGE:
+            return None
+        position = self._turf_index.get(turf_id)
+        offset = epoch_day(day) - first_day
+        if position is None or not 0 <= offset < n_days:
+            return None
+
+        entry_offset = HEADER.size + position * TURF_ENTRY.size
+        _, writes = TURF_ENTRY.unpack_from(self._map, entry_offset)
+        if writes:
+            return None
+
+        bitmaps_offset = HEADER.size + n_turfs * TURF_ENTRY.size
+        (bitmap,) = BITMAP.unpack_from(self._map, bitmaps_offset + (position * n_days + offset) * BITMAP.size)
+        return bitmap
+
+
+def build_snapshot(days=None, path=None):
+    """Rebuild the snapshot from the DB and atomically swap it into place.
+
+    The lock is held across the DB read so a booking committed while the file
+    is being built is either in the new bitmaps or bumps the new counters.
+    """
+    from .models import Booking, Turf
+
+    path = path or snapshot_path()
+    days = days or settings.AVAILABILITY_SNAPSHOT_DAYS
+    first_day = epoch_day(timezone.localdate())
+    window_start = first_day * SLOTS_PER_DAY
+    window_end = window_start + days * SLOTS_PER_DAY
+
+    with _SnapshotLock(path):
+        generation = 0
+        try:
+            with open(path, "rb") as fh:
+                previous = fh.read(HEADER.size)
+            if len(previous) == HEADER.size and previous[:8] == MAGIC:
+                generation = HEADER.unpack(previous)[1]
+        except FileNotFoundError:
+            pass
+
+        turf_ids = sorted(Turf.objects.values_list("id", flat=True))
+        positions = {turf_id: position for position, turf_id in enumerate(turf_ids)}
+        bitmaps = [0] * (len(turf_ids) * days)
+
+        bookings = Booking.objects.filter(
+            start_datetime__lt=slots.from_slot(window_end),
+            end_datetime__gt=slots.from_slot(window_start),
+        ).values_list("turf_id", "start_datetime", "end_datetime")
+        booked = {}
+        for turf_id, start, end in bookings.iterator():
+            if turf_id not in positions:
+                # turf created after the id query above; the next build picks it up
+                continue
+            booked.setdefault(turf_id, []).append((slots.to_slot(start), slots.to_slot_ceil(end)))
+        for turf_id, pairs in booked.items():
+            base = positions[turf_id] * days
+            taken = slots.clip(slots.ranges(pairs), window_start, window_end)
+            for offset in range(days):
+                day_start = window_start + offset * SLOTS_PER_DAY
+                bitmaps[base + offset] = slots.to_bitmap(slots.clip(taken, day_start, day_start + SLOTS_PER_DAY), day_start)
+
+        buffer = bytearray(HEADER.size + len(turf_ids) * TURF_ENTRY.size + len(bitmaps) * BITMAP.size)
+        HEADER.pack_into(buffer, 0, MAGIC, generation + 1, int(time.time()), first_day, days, len(turf_ids))
+        for position, turf_id in enumerate(turf_ids):
+            TURF_ENTRY.pack_into(buffer, HEADER.size + position * TURF_ENTRY.size, turf_id, 0)
+        struct.pack_into(f"<{len(bitmaps)}Q", buffer, HEADER.size + len(turf_ids) * TURF_ENTRY.size, *bitmaps)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(buffer)
+        os.replace(tmp_path, path)
+
+    return generation + 1
+
+
+def mark_turf_dirty(turf_id, path=None):
+    """Bump the in-place write counter for ``turf_id`` so readers stop trusting it.
+
+    The snapshot is only a read cache: when there is none this is a no-op, and
+    I/O errors are logged rather than failing the booking write that called it.
+    """
+    path = path or snapshot_path()
+    if not os.path.exists(path):
+        return
+    try:
+        with _SnapshotLock(path):
+            _bump_writes(turf_id, path)
+    except OSError:
+        logger.exception("Could not mark turf %s dirty in availability snapshot %s", turf_id, path)
+
+
+def _bump_writes(turf_id, path):
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except FileNotFoundError:
+        return
+    try:
+        with mmap.mmap(fd, 0) as mapped:
+            if len(mapped) < HEADER.size or mapped[:8] != MAGIC:
+                return
+            n_turfs = HEADER.unpack_from(mapped, 0)[5]
+            low, high = 0, n_turfs
+            while low < high:
+                mid = (low + high) // 2
+                offset = HEADER.size + mid * TURF_ENTRY.size
+                turf, writes = TURF_ENTRY.unpack_from(mapped, offset)
+                if turf == turf_id:
+                    TURF_ENTRY.pack_into(mapped, offset, turf, writes + 1)
+                    return
+                if turf < turf_id:
+                    low = mid + 1
+                else:
+                    high = mid
+    finally:
+        os.close(fd)
+
+
+def on_booking_change(turf_id):
+    from core.jobs import enqueue
+    transaction.on_commit(lambda: mark_turf_dirty(turf_id))
+    enqueue("turf.availability", turf_id=turf_id)
+
+
+_snapshot = None
+
+
+def get_snapshot():
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = AvailabilitySnapshot(snapshot_path())
+    return _snapshot
+
+
+def get_booked_slots(turf, day):
+    """Booked half-hour slot numbers (0-47) for ``turf`` on local ``day``.
+
+    Served from the shared snapshot when it is fresh for this turf, otherwise
+    from a single Booking query.
+    """
+    from .models import Booking
+
+    day_start, day_end = slots.day_span(day)
+    bitmap = get_snapshot().day_bitmap(turf.id, day)
+    if bitmap is not None:
+        taken = slots.from_bitmap(bitmap, day_start)
+    else:
+        bookings = Booking.objects.filter(
+            turf=turf,
+            start_datetime__lt=slots.from_slot(day_end),
+            end_datetime__gt=slots.from_slot(day_start),
+        ).values_list("start_datetime", "end_datetime")
+        taken = slots.clip(
+            slots.ranges((slots.to_slot(start), slots.to_slot_ceil(end)) for start, end in bookings),
+            day_start, day_end,
+        )
+    return [index - day_start for start, end in slots.pairs(taken) for index in range(start, end)]
+
+
+def next_available_summary(turf_ids, now=None):
+    """{turf_id: (next_available_at, open_tonight)} for the given turfs.
+
+    The next available slot is the start of the first run of free half-hour
+    slots long enough for a minimum booking, within the next
+    NEXT_AVAILABLE_DAYS. "Open tonight" means such a run fits between
+    TONIGHT_START_HOUR and midnight today. One Booking query covers all turfs.
+    """
+    from .models import Booking
+
+    now = now or timezone.now()
+    start = slots.to_slot_ceil(now)
+    horizon = start + settings.NEXT_AVAILABLE_DAYS * SLOTS_PER_DAY
+    today_start, today_end = slots.day_span(timezone.localdate(now))
+    window = slots.ranges([(start, horizon)])
+    tonight = slots.ranges([(today_start + settings.TONIGHT_START_HOUR * 60 // slots.SLOT_MINUTES, today_end)])
+
+    busy = {turf_id: [] for turf_id in turf_ids}
+    bookings = Booking.objects.filter(
+        turf_id__in=busy.keys(),
+        start_datetime__lt=slots.from_slot(horizon),
+        end_datetime__gt=slots.from_slot(start),
+    ).values_list("turf_id", "start_datetime", "end_datetime")
+    for turf_id, booking_start, booking_end in bookings.iterator():
+        busy[turf_id].append((slots.to_slot(booking_start), slots.to_slot_ceil(booking_end)))
+
+    summary = {}
+    for turf_id, pairs in busy.items():
+        free = slots.subtract(window, slots.ranges(pairs))
+        first_free = next(
+            (free_start for free_start, free_end in slots.pairs(free) if free_end - free_start >= MIN_BOOKING_SLOTS),
+            None,
+        )
+        open_tonight = any(
+            free_end - free_start >= MIN_BOOKING_SLOTS
+            for free_start, free_end in slots.pairs(slots.intersect(free, tonight))
+        )
+        summary[turf_id] = (slots.from_slot(first_free) if first_free is not None else None, open_tonight)
+    return summary
+
+
+def refresh_next_available(turf_ids, now=None):
+    """Recompute and upsert TurfAvailability rows for ``turf_ids``."""
+    from .models import Turf, TurfAvailability
+
+    # turfs deleted since their refresh was queued would fail the upsert's foreign key
+    turf_ids = list(Turf.objects.filter(id__in=turf_ids).values_list("id", flat=True))
+    summary = next_available_summary(turf_ids, now)
+    rows = [
+        TurfAvailability(turf_id=turf_id, next_available_at=next_available_at, open_tonight=open_tonight)
+        for turf_id, (next_available_at, open_tonight) in summary.items()
+    ]
+    TurfAvailability.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["turf"],
+        update_fields=["next_available_at", "open_tonight", "updated_at"],
+    )
+    return len(rows)
@@ -0,0 +1,226 @@
+import csv
+import io
+import json
+from bisect import bisect_left
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import DecimalValidator
+from django.db import transaction
+from django.db.models import F
+
+from core.models import User
+from .availability import on_booking_change
+from . import slots
+from .models import Venue, Turf, Booking
+
+# Bulk onboarding for a host's inventory. Rows are streamed from CSV or JSONL
+# in chunks; each chunk is validated in memory against one query's worth of
+# existing rows and written with bulk_create. Model save() is skipped on
+# purpose: historical bookings are in the past, and the per-row uniqueness,
+# overlap and host checks are done here once per chunk instead.
+#
+#   venues:   name
+#   turfs:    venue, name, price_per_hr
+#   bookings: venue, turf, user, start, end[, total_price]
+
+
+def read_rows(fileobj, fmt):
+    """Yield (line_number, row dict) from a binary or text CSV/JSONL file."""
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(fileobj)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(fileobj, 1):
+            if line.strip():
+                yield line_number, json.loads(line)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _parse_amount(value, field):
+    """``value`` as a Decimal that ``field`` can store, or None if it is not a finite, non-negative fit."""
+    try:
+        amount = Decimal(str(value).strip())
+        DecimalValidator(field.max_digits, field.decimal_places)(amount)
+    except (InvalidOperation, ValidationError):
+        return None
+    return amount if amount >= 0 else None
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+class InventoryImporter:
+    def __init__(self, host, chunk_size=1000):
+        self.host = host
+        self.chunk_size = chunk_size
+        self.result = {"venues": 0, "turfs": 0, "bookings": 0, "skipped": 0, "errors": []}
+        self._venues = None
+
+    def _error(self, kind, line_number, message):
+        self.result["errors"].append(f"{kind} line {line_number}: {message}")
+
+    def _objects(self, kind, rows):
+        # a JSONL line can hold any JSON value, not just an object
+        for line_number, row in rows:
+            if isinstance(row, dict):
+                yield line_number, row
+            else:
+                self._error(kind, line_number, "Row must be an object")
+
+    def _venue_ids(self):
+        if self._venues is None:
+            self._venues = dict(Venue.objects.filter(host=self.host).values_list('name', 'id'))
+        return self._venues
+
+    def import_venues(self, rows):
+        if not self.host.is_host:
+            self._error("venues", 0, "Only hosts can create venues")
+            return self.result
+        venues = self._venue_ids()
+        for chunk in _chunks(self._objects("venues", rows), self.chunk_size):
+            new = []
+            for line_number, row in chunk:
+                name = (row.get('name') or '').strip()
+                if not name:
+                    self._error("venues", line_number, "Missing venue name")
+                elif name in venues:
+                    self.result["skipped"] += 1
+                else:
+                    venues[name] = None
+                    new.append(Venue(name=name, host=self.host))
+            with transaction.atomic():
+                created = Venue.objects.bulk_create(new)
+            for venue in created:
+                venues[venue.name] = venue.pk
+            self.result["venues"] += len(created)
+        # refetch in case the backend did not return primary keys
+        self._venues = None
+        return self.result
+
+    def import_turfs(self, rows):
+        venues = self._venue_ids()
+        price_field = Turf._meta.get_field('price_per_hr')
+        for chunk in _chunks(self._objects("turfs", rows), self.chunk_size):
+            venue_ids = {venues.get((row.get('venue') or '').strip()) for _, row in chunk} - {None}
+            existing = set(
+                Turf.objects.filter(venue_id__in=venue_ids).values_list('venue_id', 'name')
+            )
+            new = []
+            for line_number, row in chunk:
+                venue_id = venues.get((row.get('venue') or '').strip())
+                name = (row.get('name') or '').strip()
+                if venue_id is None:
+                    self._error("turfs", line_number, f"Unknown venue {row.get('venue')!r}")
+                    continue
+                if not name:
+                    self._error("turfs", line_number, "Missing turf name")
+                    continue
+                price = _parse_amount(row.get('price_per_hr'), price_field)
+                if price is None:
+                    self._error("turfs", line_number, "Invalid price_per_hr")
+                    continue
+                if (venue_id, name) in existing:
+                    self.result["skipped"] += 1
+                    continue
+                existing.add((venue_id, name))
+                new.append(Turf(venue_id=venue_id, name=name, price_per_hr=price))
+            with transaction.atomic():
+                self.result["turfs"] += len(Turf.objects.bulk_create(new))
+        return self.result
+
+    def import_bookings(self, rows):
+        venues = self._venue_ids()
+        turfs = {
+            (venue_id, name): (turf_id, price)
+            for turf_id, venue_id, name, price in Turf.objects.filter(venue__host=self.host)
+            .values_list('id', 'venue_id', 'name', 'price_per_hr')
+        }
+        touched = set()
+        price_field = Booking._meta.get_field('total_price')
+        try:
+            for chunk in _chunks(self._objects("bookings", rows), self.chunk_size):
+                parsed = []
+                usernames = set()
+                for line_number, row in chunk:
+                    turf = turfs.get((venues.get((row.get('venue') or '').strip()), (row.get('turf') or '').strip()))
+                    if turf is None:
+                        self._error("bookings", line_number, f"Unknown turf {row.get('venue')!r} / {row.get('turf')!r}")
+                        continue
+                    try:
+                        start = slots.parse_local(row.get('start'), fmt=None)
+                        end = slots.parse_local(row.get('end'), fmt=None)
+                    except (TypeError, ValueError):
+                        self._error("bookings", line_number, "Invalid start/end datetime")
+                        continue
+                    if end <= start:
+                        self._error("bookings", line_number, "End time must be after start time")
+                        continue
+                    if not slots.is_aligned(start) or not slots.is_aligned(end):
+                        self._error("bookings", line_number, "Start and end times must be on the hour or half-hour")
+                        continue
+                    usernames.add(row.get('user'))
+                    parsed.append((line_number, row, turf, start, end, slots.span(start, end)))
+                if not parsed:
+                    continue
+
+                users = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+                turf_ids = {turf[0] for _, _, turf, *_ in parsed}
+                # one query for every booking these rows could collide with
+                taken = {turf_id: [] for turf_id in turf_ids}
+                for turf_id, start, end in Booking.objects.filter(
+                    turf_id__in=turf_ids,
+                    start_datetime__lt=max(end for _, _, _, _, end, _ in parsed),
+                    end_datetime__gt=min(start for _, _, _, start, _, _ in parsed),
+                ).values_list('turf_id', 'start_datetime', 'end_datetime'):
+                    taken[turf_id].append((slots.to_slot(start), slots.to_slot_ceil(end)))
+                for intervals in taken.values():
+                    intervals.sort()
+
+                new = []
+                for line_number, row, (turf_id, price), start, end, span in parsed:
+                    user_id = users.get(row.get('user'))
+                    if user_id is None:
+                        self._error("bookings", line_number, f"Unknown user {row.get('user')!r}")
+                        continue
+                    intervals = taken[turf_id]
+                    requested = tuple(span)
+                    position = bisect_left(intervals, requested)
+                    if position < len(intervals) and intervals[position] == requested:
+                        # already imported, e.g. a re-run of the same file
+                        self.result["skipped"] += 1
+                        continue
+                    if (position > 0 and intervals[position - 1][1] > requested[0]) or (
+                        position < len(intervals) and intervals[position][0] < requested[1]
+                    ):
+                        self._error("bookings", line_number, "Overlaps with another booking")
+                        continue
+                    if row.get('total_price') not in (None, ''):
+                        total_price = _parse_amount(row['total_price'], price_field)
+                    else:
+                        total_price = _parse_amount(slots.price(span, price), price_field)
+                    if total_price is None:
+                        self._error("bookings", line_number, "Invalid total_price")
+                        continue
+                    intervals.insert(position, requested)
+                    new.append(Booking(
+                        turf_id=turf_id, user_id=user_id, start_datetime=start, end_datetime=end, total_price=total_price,
+                    ))
+                    touched.add(turf_id)
+                with transaction.atomic():
+                    self.result["bookings"] += len(Booking.objects.bulk_create(new))
+        finally:
+            # bulk_create skips Booking.save and its signals, so do the version/snapshot
+            # bookkeeping once per turf, including for chunks written before a failure
+            Turf.objects.filter(id__in=touched).update(booking_version=F('booking_version') + 1)
+            for turf_id in touched:
+                on_booking_change(turf_id)
+        return self.result
@@ -0,0 +1,42 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import User
+from host.importer import InventoryImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import a host's venues, turfs and historical bookings from CSV or JSONL files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("host", help="Username of the host that owns the inventory.")
+        parser.add_argument("--venues", help="File with columns: name")
+        parser.add_argument("--turfs", help="File with columns: venue, name, price_per_hr")
+        parser.add_argument("--bookings", help="File with columns: venue, turf, user, start, end[, total_price]")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            host = User.objects.get(username=options["host"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['host']!r} does not exist")
+        if not host.is_host:
+            raise CommandError(f"User {host.username!r} is not a host")
+
+        importer = InventoryImporter(host, chunk_size=options["chunk_size"])
+        for kind in ("venues", "turfs", "bookings"):
+            path = options[kind]
+            if not path:
+                continue
+            fmt = os.path.splitext(path)[1].lstrip(".").lower()
+            with open(path, encoding="utf-8", newline="") as fh:
+                getattr(importer, f"import_{kind}")(read_rows(fh, fmt))
+
+        result = importer.result
+        for error in result["errors"]:
+            self.stderr.write(error)
+        self.stdout.write(
+            f"Imported {result['venues']} venue(s), {result['turfs']} turf(s), {result['bookings']} booking(s); "
+            f"skipped {result['skipped']} existing, {len(result['errors'])} error(s)"
+        )
@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from host.availability import build_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = "Rebuild the shared availability snapshot read by every worker process."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.AVAILABILITY_SNAPSHOT_DAYS)
+        parser.add_argument("--interval", type=int, default=0, help="Keep rebuilding every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            generation = build_snapshot(days=options["days"])
+            self.stdout.write(
+                f"Built availability snapshot #{generation} at {snapshot_path()} "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,42 @@
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from host.availability import refresh_next_available
+from host.models import Turf
+
+
+class Command(BaseCommand):
+    help = "Sweep per-turf next-available summaries that went stale as time passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute every turf, not just stale ones.")
+        parser.add_argument("--interval", type=int, default=0, help="Keep sweeping every N seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            now = timezone.now()
+            turfs = Turf.objects.all()
+            if not options["all"]:
+                midnight = timezone.make_aware(datetime.combine(timezone.localdate(now), datetime.min.time()))
+                tonight = midnight.replace(hour=settings.TONIGHT_START_HOUR)
+                stale = (
+                    Q(availability__isnull=True)
+                    | Q(availability__next_available_at__lte=now)
+                    | Q(availability__updated_at__lt=midnight)
+                )
+                if now >= tonight:
+                    # an open_tonight computed before the evening window started may have passed
+                    stale |= Q(availability__open_tonight=True)
+                turfs = turfs.filter(stale)
+            turf_ids = list(turfs.values_list("id", flat=True))
+            for start in range(0, len(turf_ids), 500):
+                refresh_next_available(turf_ids[start:start + 500], now)
+            self.stdout.write(f"Refreshed next-available summary for {len(turf_ids)} turf(s)")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("host", "0002_change_tracking"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["start_datetime"], name="host_bookin_start_d_8c8568_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("host", "0003_booking_start_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TurfAvailability",
+            fields=[
+                (
+                    "turf",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="availability",
+                        serialize=False,
+                        to="host.turf",
+                    ),
+                ),
+                (
+                    "next_available_at",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                ("open_tonight", models.BooleanField(db_index=True, default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
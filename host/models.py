@@ -1,8 +1,11 @@
 from django.db import models
+from django.db.models import F
 from core.models import User
-from datetime import datetime
 from django.core.exceptions import ValidationError
-from decimal import Decimal
+from django.utils import timezone
+from . import slots
+from core.jobs import enqueue
+from core import events
 
 # Create your models here.
 class Venue(models.Model):
@@ -10,6 +13,7 @@ class Venue(models.Model):
     name = models.CharField(max_length=100)
     host = models.ForeignKey(User, on_delete=models.CASCADE)
     # address, gmaps link
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         # also add a check that name is unique
@@ -24,6 +28,8 @@ class Turf(models.Model):
     venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name='turfs')
     name = models.CharField(max_length=100) # turf name: 5-a-side, 7-a-side, 11-a-side or football, cricket, etc.
     price_per_hr = models.DecimalField(max_digits=6, decimal_places=2) # price per hour
+    updated_at = models.DateTimeField(auto_now=True)
+    booking_version = models.PositiveIntegerField(default=0) # bumped on every booking write, used for ETags
     # bookings
     #  opening and closing hours
     #  available days
@@ -40,10 +46,28 @@ class Turf(models.Model):
         
     def save(self, *args, **kwargs):
         self.clean()  # Call the clean method to perform validation
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # booking_version is only ever bumped with F() by Booking, never overwrite it from a stale instance
+            kwargs['update_fields'] = [f.name for f in self._meta.concrete_fields if not f.primary_key and f.name != 'booking_version']
+        is_new = self._state.adding
         super().save(*args, **kwargs)  # Call the real save() method
+        if is_new:
+            enqueue("turf.availability", turf_id=self.pk)
         
     def __str__(self):
         return f"{self.venue.name} -> {self.name}"
+
+
+class TurfAvailability(models.Model):
+    # precomputed by host.availability.refresh_next_available, kept current by
+    # booking writes (via the job queue) and `manage.py refresh_next_available`
+    turf = models.OneToOneField(Turf, on_delete=models.CASCADE, primary_key=True, related_name='availability')
+    next_available_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    open_tonight = models.BooleanField(default=False, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.turf_id}: {self.next_available_at}"
     
 
 
@@ -63,16 +87,19 @@ class Booking(models.Model):
         return self.end_datetime.strftime('%H:%M')
     class Meta:
         unique_together = ('turf', 'start_datetime', 'end_datetime')
+        indexes = [
+            models.Index(fields=['start_datetime']),
+        ]
     
     def _validate_time_slots(self):
-        if self.start_datetime.minute not in [0, 30] or self.end_datetime.minute not in [0, 30]:
+        if not slots.is_aligned(self.start_datetime) or not slots.is_aligned(self.end_datetime):
             raise ValidationError('Start and end times must be on the hour or half-hour.')
         # if booking conflicts with maintenance time
 
     def _validate_booking_order(self):
         if self.end_datetime <= self.start_datetime:
             raise ValidationError('End time must be after start time.')
-        if self.start_datetime < datetime.now():
+        if self.start_datetime < timezone.now():
             raise ValidationError('Booking cannot be in the past.')
 
     def _check_overlap(self):
@@ -85,6 +112,19 @@ class Booking(models.Model):
         if overlapping_bookings.exists():
             raise ValidationError('This booking overlaps with another booking.')
 
+    def _record_event(self, event_type, **fields):
+        fields.setdefault('booking_id', self.pk)
+        if 'venue_id' not in fields:
+            fields['venue_id'] = self.turf.venue_id
+        events.record_on_commit(
+            event_type, turf_id=self.turf_id, user_id=self.user_id,
+            start=self.start_datetime, end=self.end_datetime, amount=self.total_price, **fields,
+        )
+
+    def _bump_turf_version(self):
+        # .update() skips auto_now, so the turf's own updated_at is left alone
+        Turf.objects.filter(pk=self.turf_id).update(booking_version=F('booking_version') + 1)
+
     def clean(self):
         self._validate_time_slots()
         self._validate_booking_order()
@@ -92,11 +132,17 @@ class Booking(models.Model):
         
     
     def save(self, *args, **kwargs):
+        # naive datetimes are local wall-clock times, compare and store them as aware
+        if timezone.is_naive(self.start_datetime):
+            self.start_datetime = timezone.make_aware(self.start_datetime)
+        if timezone.is_naive(self.end_datetime):
+            self.end_datetime = timezone.make_aware(self.end_datetime)
         self.clean()  # Validate before saving
         if not self.pk:  # Only calculate total_price on creation
-            duration = Decimal((self.end_datetime - self.start_datetime).total_seconds()) / Decimal(3600.0)  # duration in hours
-            self.total_price = duration * self.turf.price_per_hr
+            self.total_price = slots.price(slots.span(self.start_datetime, self.end_datetime), self.turf.price_per_hr)
         super().save(*args, **kwargs)
+        # version, snapshot, job and event bookkeeping runs from host.signals so
+        # that queryset and cascade deletes are covered too
         
     def __str__(self):
         return f"{self.turf.venue.name} -> {self.turf.name} -> {self.get_start_time()} to {self.end_datetime}"
@@ -0,0 +1,70 @@
+import threading
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core import events
+from core.jobs import enqueue
+from .availability import on_booking_change
+from .models import Booking, Turf
+
+# Booking bookkeeping (turf booking_version, availability snapshot and summary
+# refresh, analytics events). Saves are handled one booking at a time. Deletes
+# can come in bulk (admin actions, user/venue/turf cascades), so the turfs they
+# touch are collected and handled once each when the transaction commits, and
+# bookings that go away together with their turf are skipped altogether.
+
+_state = threading.local()
+
+
+def _changed_turfs():
+    if not hasattr(_state, "changed_turfs"):
+        _state.changed_turfs = set()
+    return _state.changed_turfs
+
+
+def _flush_changed_turfs():
+    # registered once per deleted booking; the first callback after commit does the work
+    turf_ids = _changed_turfs()
+    if not turf_ids:
+        return
+    _state.changed_turfs = set()
+    Turf.objects.filter(pk__in=turf_ids).update(booking_version=F('booking_version') + 1)
+    for turf_id in turf_ids:
+        on_booking_change(turf_id)
+
+
+def _turf_is_being_deleted(turf_id, origin):
+    return getattr(_state, "deleting_origin", None) is origin and turf_id in _state.deleting_turfs
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, **kwargs):
+    instance._bump_turf_version()
+    on_booking_change(instance.turf_id)
+    if created:
+        enqueue("booking.created", booking_id=instance.pk)
+        instance._record_event(events.BOOKING_CREATED)
+
+
+@receiver(pre_delete, sender=Turf)
+def turf_deleting(sender, instance, origin=None, **kwargs):
+    # pre_delete runs for every collected object before anything is deleted, so by
+    # the time the turf's bookings are removed we know the turf is going too
+    if getattr(_state, "deleting_origin", None) is not origin:
+        _state.deleting_origin = origin
+        _state.deleting_turfs = set()
+    _state.deleting_turfs.add(instance.pk)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, origin=None, **kwargs):
+    if _turf_is_being_deleted(instance.turf_id, origin):
+        return
+    _changed_turfs().add(instance.turf_id)
+    transaction.on_commit(_flush_changed_turfs)
+    # a user's bookings going away with their account are not cancellations
+    if isinstance(origin, Booking) or getattr(origin, 'model', None) is Booking:
+        instance._record_event(events.BOOKING_CANCELLED)
@@ -0,0 +1,193 @@
+from array import array
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.utils import timezone
+
+# Half-hour slot arithmetic. A slot index is the number of half hours since
+# 1970-01-01 00:00 *local* wall-clock time (TIME_ZONE), i.e.
+# ``epoch_day * SLOTS_PER_DAY + slot_of_day``. Everything that reasons about
+# bookings (validation, availability, pricing) converts datetimes once at the
+# edge and then works on plain integers.
+#
+# Sets of slots are "range arrays": a flat array('q') of half-open
+# [start, end) pairs, sorted and non-overlapping, e.g. array('q', [4, 6, 10, 12])
+# covers slots 4, 5, 10 and 11. The set operations below merge two of them in
+# a single linear pass.
+
+SLOT_MINUTES = 30
+SLOT_SECONDS = SLOT_MINUTES * 60
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+SLOTS_PER_DAY = 24 * SLOTS_PER_HOUR
+EPOCH = date(1970, 1, 1)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+
+
+def _wall_seconds(dt):
+    """Seconds since the epoch on the local wall clock."""
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    local = timezone.localtime(dt)
+    return local.timestamp() + local.utcoffset().total_seconds()
+
+
+def epoch_day(day):
+    return (day - EPOCH).days
+
+
+def day_of(index):
+    return EPOCH + timedelta(days=index // SLOTS_PER_DAY)
+
+
+def to_slot(dt):
+    """Slot containing ``dt`` (aware, or naive in local time)."""
+    return int(_wall_seconds(dt) // SLOT_SECONDS)
+
+
+def to_slot_ceil(dt):
+    """First slot starting at or after ``dt``."""
+    return int(-(-_wall_seconds(dt) // SLOT_SECONDS))
+
+
+def from_slot(index):
+    """Aware local datetime at the start of slot ``index``."""
+    return timezone.make_aware(_EPOCH_NAIVE + timedelta(minutes=index * SLOT_MINUTES))
+
+
+def is_aligned(dt):
+    return _wall_seconds(dt) % SLOT_SECONDS == 0
+
+
+def parse_local(value, fmt='%Y-%m-%dT%H:%M'):
+    """Parse a wall-clock string (as sent by datetime-local inputs) into an aware datetime.
+
+    Raises ValueError on malformed input and TypeError when it is missing.
+    """
+    parsed = datetime.strptime(value, fmt) if fmt else datetime.fromisoformat(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def day_span(day):
+    start = epoch_day(day) * SLOTS_PER_DAY
+    return start, start + SLOTS_PER_DAY
+
+
+def label(index):
+    """'HH:MM' for a slot index (or slot-of-day)."""
+    minutes = (index % SLOTS_PER_DAY) * SLOT_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def price(a, price_per_hr):
+    """Price of the slots in ``a`` at an hourly rate, without going through float seconds.
+
+    Rounded to paise, as stored, so the instance, events and DB all agree.
+    """
+    return (Decimal(length(a)) * price_per_hr / SLOTS_PER_HOUR).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def span(start_dt, end_dt):
+    """Range array covering every slot touched by [start_dt, end_dt)."""
+    return array('q', [to_slot(start_dt), to_slot_ceil(end_dt)])
+
+
+# range arrays
+
+
+def ranges(pairs):
+    """Normalize an iterable of (start, end) pairs into a range array."""
+    result = array('q')
+    for start, end in sorted(pair for pair in pairs if pair[0] < pair[1]):
+        if result and start <= result[-1]:
+            if end > result[-1]:
+                result[-1] = end
+        else:
+            result.append(start)
+            result.append(end)
+    return result
+
+
+def pairs(a):
+    return zip(a[::2], a[1::2])
+
+
+def union(a, b):
+    return ranges(list(pairs(a)) + list(pairs(b)))
+
+
+def intersect(a, b):
+    result = array('q')
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i], b[j])
+        end = min(a[i + 1], b[j + 1])
+        if start < end:
+            result.append(start)
+            result.append(end)
+        if a[i + 1] < b[j + 1]:
+            i += 2
+        else:
+            j += 2
+    return result
+
+
+def subtract(a, b):
+    result = array('q')
+    j = 0
+    for i in range(0, len(a), 2):
+        start, end = a[i], a[i + 1]
+        while j < len(b) and b[j + 1] <= start:
+            j += 2
+        k = j
+        while k < len(b) and b[k] < end:
+            if b[k] > start:
+                result.append(start)
+                result.append(b[k])
+            start = max(start, b[k + 1])
+            k += 2
+        if start < end:
+            result.append(start)
+            result.append(end)
+    return result
+
+
+def length(a):
+    return sum(a[1::2]) - sum(a[::2])
+
+
+def overlaps(a, b):
+    return len(intersect(a, b)) > 0
+
+
+def clip(a, start, end):
+    return intersect(a, array('q', [start, end]))
+
+
+def to_bitmap(a, first):
+    """Bitmask of the slots in ``a`` relative to slot ``first`` (bit 0 = ``first``)."""
+    bitmap = 0
+    for start, end in pairs(a):
+        if end > first:
+            start = max(start, first)
+            bitmap |= ((1 << (end - start)) - 1) << (start - first)
+    return bitmap
+
+
+def from_bitmap(bitmap, first):
+    result = array('q')
+    offset = 0
+    while bitmap:
+        if bitmap & 1:
+            run = 0
+            while bitmap & 1:
+                bitmap >>= 1
+                run += 1
+            result.append(first + offset)
+            result.append(first + offset + run)
+            offset += run
+        else:
+            bitmap >>= 1
+            offset += 1
+    return result
@@ -0,0 +1,7 @@
+from core.jobs import register_job
+from .availability import refresh_next_available
+
+
+@register_job("turf.availability", batch=True)
+def refresh_turf_availability(payloads):
+    refresh_next_available({payload["turf_id"] for payload in payloads})
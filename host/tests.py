@@ -1,3 +1,345 @@
-from django.test import TestCase
+import io
+import os
+import random
+import tempfile
+from array import array
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Job, User
+from . import availability, slots
+from .importer import InventoryImporter, read_rows
+from .models import Booking, Turf, Venue
+
+
+def as_set(a):
+    return {index for start, end in slots.pairs(a) for index in range(start, end)}
+
+
+def from_set(indexes):
+    return slots.ranges((index, index + 1) for index in indexes)
+
+
+class RangeArrayTests(SimpleTestCase):
+    def random_ranges(self, rng):
+        return slots.ranges((start, start + rng.randint(1, 6)) for start in rng.sample(range(60), rng.randint(0, 8)))
+
+    def test_operations_match_set_semantics(self):
+        rng = random.Random(1234)
+        for _ in range(500):
+            a, b = self.random_ranges(rng), self.random_ranges(rng)
+            with self.subTest(a=list(a), b=list(b)):
+                self.assertEqual(as_set(slots.union(a, b)), as_set(a) | as_set(b))
+                self.assertEqual(as_set(slots.intersect(a, b)), as_set(a) & as_set(b))
+                self.assertEqual(as_set(slots.subtract(a, b)), as_set(a) - as_set(b))
+                self.assertEqual(slots.length(a), len(as_set(a)))
+                self.assertEqual(slots.overlaps(a, b), bool(as_set(a) & as_set(b)))
+                self.assertEqual(as_set(slots.clip(a, 10, 30)), {i for i in as_set(a) if 10 <= i < 30})
+
+    def test_results_are_normalized(self):
+        rng = random.Random(99)
+        for _ in range(200):
+            a, b = self.random_ranges(rng), self.random_ranges(rng)
+            for result in (slots.union(a, b), slots.intersect(a, b), slots.subtract(a, b)):
+                self.assertEqual(result, from_set(as_set(result)))
+
+    def test_ranges_merges_touching_and_drops_empty_pairs(self):
+        self.assertEqual(slots.ranges([(6, 8), (0, 2), (2, 4), (5, 5), (7, 10)]), array('q', [0, 4, 6, 10]))
+
+    def test_bitmap_round_trip(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            a = slots.clip(self.random_ranges(rng), 0, 48)
+            first = 1000 * slots.SLOTS_PER_DAY
+            shifted = array('q', [index + first for index in a])
+            bitmap = slots.to_bitmap(shifted, first)
+            self.assertEqual(bitmap, sum(1 << index for index in as_set(a)))
+            self.assertEqual(slots.from_bitmap(bitmap, first), shifted)
+
+    def test_to_bitmap_ignores_slots_before_first(self):
+        self.assertEqual(slots.to_bitmap(array('q', [2, 6]), 4), 0b11)
+
+
+class SlotConversionTests(SimpleTestCase):
+    def test_aware_and_naive_local_datetimes_map_to_the_same_slot(self):
+        naive = datetime(2026, 3, 1, 10, 30)
+        aware = timezone.make_aware(naive)
+        utc = datetime(2026, 3, 1, 5, 0, tzinfo=dt_timezone.utc)  # 10:30 in Asia/Kolkata
+        expected = slots.epoch_day(date(2026, 3, 1)) * slots.SLOTS_PER_DAY + 21
+        self.assertEqual(slots.to_slot(naive), expected)
+        self.assertEqual(slots.to_slot(aware), expected)
+        self.assertEqual(slots.to_slot(utc), expected)
+
+    def test_ceil_and_floor(self):
+        start = timezone.make_aware(datetime(2026, 3, 1, 10, 30))
+        self.assertEqual(slots.to_slot_ceil(start), slots.to_slot(start))
+        self.assertEqual(slots.to_slot_ceil(start + timedelta(minutes=1)), slots.to_slot(start) + 1)
+        self.assertEqual(slots.to_slot(start + timedelta(minutes=29)), slots.to_slot(start))
+
+    def test_from_slot_round_trip(self):
+        start = timezone.make_aware(datetime(2026, 3, 1, 23, 30))
+        self.assertEqual(slots.from_slot(slots.to_slot(start)), start)
+        self.assertEqual(slots.day_of(slots.to_slot(start)), date(2026, 3, 1))
+        self.assertEqual(slots.label(slots.to_slot(start)), "23:30")
+
+    def test_day_span(self):
+        start, end = slots.day_span(date(2026, 3, 1))
+        self.assertEqual(end - start, slots.SLOTS_PER_DAY)
+        self.assertEqual(slots.from_slot(start), timezone.make_aware(datetime(2026, 3, 1)))
+
+    def test_is_aligned(self):
+        self.assertTrue(slots.is_aligned(datetime(2026, 3, 1, 10, 30)))
+        self.assertTrue(slots.is_aligned(datetime(2026, 3, 1, 10, 0)))
+        self.assertFalse(slots.is_aligned(datetime(2026, 3, 1, 10, 15)))
+        self.assertFalse(slots.is_aligned(datetime(2026, 3, 1, 10, 0, 1)))
+
+    def test_parse_local(self):
+        parsed = slots.parse_local("2026-03-01T10:30")
+        self.assertTrue(timezone.is_aware(parsed))
+        self.assertEqual(parsed, timezone.make_aware(datetime(2026, 3, 1, 10, 30)))
+        # ISO input keeps an explicit offset
+        self.assertEqual(
+            slots.parse_local("2026-03-01T05:00+00:00", fmt=None),
+            datetime(2026, 3, 1, 5, 0, tzinfo=dt_timezone.utc),
+        )
+        with self.assertRaises(ValueError):
+            slots.parse_local("01/03/2026 10:30")
+        with self.assertRaises(TypeError):
+            slots.parse_local(None)
+
+    def test_span_covers_partial_slots(self):
+        start = timezone.make_aware(datetime(2026, 3, 1, 10, 15))
+        a = slots.span(start, start + timedelta(minutes=30))
+        self.assertEqual(slots.length(a), 2)
+
+    def test_price_is_rounded_to_paise(self):
+        self.assertEqual(slots.price(array('q', [0, 3]), Decimal('333.33')), Decimal('500.00'))
+        self.assertEqual(slots.price(array('q', [0, 2, 4, 5]), Decimal('100')), Decimal('150.00'))
+
+
+class TempSnapshotMixin:
+    """Point the snapshot and event log at a temporary directory for each test."""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "availability.snapshot")
+        settings_override = override_settings(AVAILABILITY_SNAPSHOT_PATH=self.path, EVENT_LOG_DIR=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        availability._snapshot = None
+        self.addCleanup(setattr, availability, "_snapshot", None)
+
+
+class InventoryTestCase(TempSnapshotMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create(username="host", is_host=True)
+        cls.player = User.objects.create(username="player")
+        cls.venue = Venue.objects.create(name="Arena", host=cls.host)
+        cls.turf = Turf.objects.create(venue=cls.venue, name="5-a-side", price_per_hr=600)
+        cls.other_turf = Turf.objects.create(venue=cls.venue, name="7-a-side", price_per_hr=900)
+
+    def setUp(self):
+        super().setUp()
+        self.day = timezone.localdate() + timedelta(days=1)
+
+    def at(self, hour, minute=0, day=None):
+        return timezone.make_aware(datetime.combine(day or self.day, datetime.min.time()) + timedelta(hours=hour, minutes=minute))
+
+    def book(self, turf, start, end, user=None):
+        return Booking.objects.create(turf=turf, user=user or self.player, total_price=0, start_datetime=start, end_datetime=end)
+
+
+class AvailabilitySnapshotTests(InventoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.book(self.turf, self.at(10), self.at(11))
+        self.book(self.turf, self.at(13, 30), self.at(14, 30))
+        self.book(self.other_turf, self.at(23), self.at(24))  # ends at midnight
+
+    def test_build_round_trips_bitmaps(self):
+        self.assertEqual(availability.build_snapshot(days=3), 1)
+        snapshot = availability.AvailabilitySnapshot(self.path)
+        self.assertEqual(snapshot.day_bitmap(self.turf.id, self.day), (1 << 20) | (1 << 21) | (1 << 27) | (1 << 28))
+        self.assertEqual(snapshot.day_bitmap(self.other_turf.id, self.day), (1 << 46) | (1 << 47))
+        self.assertEqual(snapshot.day_bitmap(self.turf.id, self.day + timedelta(days=1)), 0)
+        self.assertEqual(availability.build_snapshot(days=3), 2)
+
+    def test_dirty_turf_is_not_trusted(self):
+        availability.build_snapshot(days=3)
+        snapshot = availability.AvailabilitySnapshot(self.path)
+        self.assertIsNotNone(snapshot.day_bitmap(self.turf.id, self.day))
+        availability.mark_turf_dirty(self.turf.id)
+        self.assertIsNone(snapshot.day_bitmap(self.turf.id, self.day))
+        self.assertIsNotNone(snapshot.day_bitmap(self.other_turf.id, self.day))
+
+    def test_falls_back_outside_window_and_for_unknown_turfs(self):
+        availability.build_snapshot(days=3)
+        snapshot = availability.AvailabilitySnapshot(self.path)
+        self.assertIsNone(snapshot.day_bitmap(self.turf.id, self.day + timedelta(days=5)))
+        self.assertIsNone(snapshot.day_bitmap(self.turf.id, self.day - timedelta(days=2)))
+        self.assertIsNone(snapshot.day_bitmap(self.other_turf.id + 100, self.day))
+
+    def test_falls_back_when_too_old(self):
+        availability.build_snapshot(days=3)
+        snapshot = availability.AvailabilitySnapshot(self.path)
+        with override_settings(AVAILABILITY_SNAPSHOT_MAX_AGE=-1):
+            self.assertIsNone(snapshot.day_bitmap(self.turf.id, self.day))
+
+    def test_falls_back_without_a_snapshot(self):
+        self.assertIsNone(availability.AvailabilitySnapshot(self.path).day_bitmap(self.turf.id, self.day))
+        availability.mark_turf_dirty(self.turf.id)  # no-op, no file
+        self.assertFalse(os.path.exists(self.path + ".lock"))
+
+    def test_mark_turf_dirty_never_raises(self):
+        availability.build_snapshot(days=3)
+        os.remove(self.path)
+        os.mkdir(self.path)  # exists, but cannot be opened as the snapshot
+        with self.assertLogs("host.availability", "ERROR"):
+            availability.mark_turf_dirty(self.turf.id)
+
+    def test_booked_slots_match_with_and_without_snapshot(self):
+        days = [self.day, self.day + timedelta(days=1)]
+        from_db = {(turf.id, day): availability.get_booked_slots(turf, day) for turf in (self.turf, self.other_turf) for day in days}
+        self.assertEqual(from_db[self.turf.id, self.day], [20, 21, 27, 28])
+        self.assertEqual(from_db[self.other_turf.id, self.day], [46, 47])
+
+        availability.build_snapshot(days=3)
+        with self.assertNumQueries(0):
+            from_snapshot = {key: availability.get_booked_slots(turf, key[1]) for turf in (self.turf, self.other_turf) for key in [(turf.id, day) for day in days]}
+        self.assertEqual(from_snapshot, from_db)
+
+
+class BookingSignalTests(InventoryTestCase):
+    def test_queryset_delete_bookkeeping_runs_once_per_turf(self):
+        bookings = [self.book(self.turf, self.at(hour), self.at(hour + 1)) for hour in (8, 10, 12)]
+        Job.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).delete()
+        self.turf.refresh_from_db()
+        self.assertEqual(self.turf.booking_version, 4)  # three creates, one batched delete
+        self.assertEqual(list(Job.objects.values_list("name", "payload")), [("turf.availability", {"turf_id": self.turf.id})])
+
+    def test_bookings_deleted_with_their_turf_are_skipped(self):
+        self.book(self.turf, self.at(8), self.at(9))
+        self.book(self.other_turf, self.at(8), self.at(9))
+        Job.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.turf.delete()
+        self.assertFalse(Job.objects.exists())
+        # a user's bookings cascading away still free slots on turfs that remain
+        with self.captureOnCommitCallbacks(execute=True):
+            self.player.delete()
+        self.assertEqual(list(Job.objects.values_list("payload", flat=True)), [{"turf_id": self.other_turf.id}])
+
+
+def rows(text, fmt="csv"):
+    return read_rows(io.BytesIO(text.encode()), fmt)
+
+
+class InventoryImporterTests(InventoryTestCase):
+    def importer(self):
+        return InventoryImporter(self.host, chunk_size=2)
+
+    def test_duplicates_and_reruns_are_skipped(self):
+        importer = self.importer()
+        importer.import_venues(rows("name\nArena\nDome\nDome\n"))
+        importer.import_turfs(rows("venue,name,price_per_hr\nDome,Box,450\nDome,Box,450\nArena,5-a-side,600\n"))
+        bookings = "venue,turf,user,start,end\nDome,Box,player,2026-01-05T18:00,2026-01-05T19:00\n"
+        importer.import_bookings(rows(bookings))
+        importer.import_bookings(rows(bookings))
+        self.assertEqual(importer.result["errors"], [])
+        self.assertEqual(
+            {key: importer.result[key] for key in ("venues", "turfs", "bookings", "skipped")},
+            {"venues": 1, "turfs": 1, "bookings": 1, "skipped": 5},
+        )
+        booking = Booking.objects.get(turf__name="Box")
+        self.assertEqual(booking.total_price, Decimal("450.00"))
+
+    def test_overlaps_are_rejected(self):
+        self.book(self.turf, self.at(10), self.at(11))
+        day = self.day.isoformat()
+        importer = self.importer()
+        importer.import_bookings(rows(
+            "venue,turf,user,start,end\n"
+            f"Arena,5-a-side,player,{day}T10:30,{day}T11:30\n"  # existing row
+            f"Arena,5-a-side,player,{day}T12:00,{day}T13:00\n"
+            f"Arena,5-a-side,player,{day}T12:30,{day}T13:30\n"  # same chunk
+            f"Arena,5-a-side,player,{day}T13:00,{day}T14:00\n"  # earlier chunk
+            f"Arena,7-a-side,player,{day}T10:00,{day}T11:00\n"  # other turf
+        ))
+        self.assertEqual(importer.result["errors"], [
+            "bookings line 2: Overlaps with another booking",
+            "bookings line 4: Overlaps with another booking",
+        ])
+        self.assertEqual(importer.result["bookings"], 3)
+
+    def test_bad_prices_are_reported(self):
+        importer = self.importer()
+        importer.import_turfs(rows(
+            '{"venue": "Arena", "name": "a", "price_per_hr": "NaN"}\n'
+            '{"venue": "Arena", "name": "b", "price_per_hr": 99999999}\n'
+            '{"venue": "Arena", "name": "c", "price_per_hr": -5}\n'
+            '{"venue": "Arena", "name": "d", "price_per_hr": "1.234"}\n'
+            '{"venue": "Arena", "name": "e", "price_per_hr": "abc"}\n'
+            '{"venue": "Arena", "name": "f", "price_per_hr": "1200.50"}\n',
+            fmt="jsonl",
+        ))
+        self.assertEqual(importer.result["errors"], [f"turfs line {line}: Invalid price_per_hr" for line in range(1, 6)])
+        self.assertEqual(Turf.objects.get(name="f").price_per_hr, Decimal("1200.50"))
+
+        importer.import_bookings(rows(
+            "venue,turf,user,start,end,total_price\n"
+            "Arena,5-a-side,player,2026-01-05T10:00,2026-01-05T11:00,abc\n"
+            "Arena,5-a-side,player,2026-01-05T12:00,2026-01-05T13:00,inf\n"
+            "Arena,5-a-side,player,2026-01-05T14:00,2026-01-05T15:00,550\n"
+        ))
+        self.assertEqual(importer.result["errors"][5:], [
+            "bookings line 2: Invalid total_price",
+            "bookings line 3: Invalid total_price",
+        ])
+        self.assertEqual(list(Booking.objects.values_list("total_price", flat=True)), [Decimal("550.00")])
+
+    def test_non_object_jsonl_rows_are_reported(self):
+        importer = self.importer()
+        importer.import_venues(rows('{"name": "Dome"}\n[1, 2]\n"Arena"\n\n', fmt="jsonl"))
+        self.assertEqual(importer.result["errors"], [
+            "venues line 2: Row must be an object",
+            "venues line 3: Row must be an object",
+        ])
+        self.assertEqual(importer.result["venues"], 1)
+
+    def test_unknown_users_and_turfs_are_reported(self):
+        importer = self.importer()
+        importer.import_bookings(rows(
+            "venue,turf,user,start,end\n"
+            "Arena,5-a-side,nobody,2026-01-05T10:00,2026-01-05T11:00\n"
+            "Arena,Nope,player,2026-01-05T10:00,2026-01-05T11:00\n"
+        ))
+        self.assertEqual(importer.result["errors"], [
+            "bookings line 3: Unknown turf 'Arena' / 'Nope'",
+            "bookings line 2: Unknown user 'nobody'",
+        ])
+        self.assertFalse(Booking.objects.exists())
+
+    def test_touched_turfs_get_one_version_bump(self):
+        importer = self.importer()
+        importer.import_bookings(rows(
+            "venue,turf,user,start,end\n"
+            "Arena,5-a-side,player,2026-01-05T10:00,2026-01-05T11:00\n"
+            "Arena,5-a-side,player,2026-01-05T11:00,2026-01-05T12:00\n"
+            "Arena,5-a-side,player,2026-01-05T12:00,2026-01-05T13:00\n"
+        ))
+        self.turf.refresh_from_db()
+        self.other_turf.refresh_from_db()
+        self.assertEqual((self.turf.booking_version, self.other_turf.booking_version), (1, 0))
+
+    def test_only_hosts_can_import_venues(self):
+        importer = InventoryImporter(self.player)
+        importer.import_venues(rows("name\nDome\n"))
+        self.assertEqual(importer.result["errors"], ["venues line 0: Only hosts can create venues"])
@@ -1,7 +1,8 @@
 from django.urls import path
+from .views import *
 
 urlpatterns = [
-    
+    path("import/", import_view, name="import"),
 ]
 
 app_name = 'host'
\ No newline at end of file
@@ -1,3 +1,26 @@
-from django.shortcuts import render
+import os
+
+from django.shortcuts import render, HttpResponseRedirect
+from django.urls import reverse
+
+from .importer import InventoryImporter, read_rows
 
 # Create your views here.
+def import_view(req):
+    if not req.user.is_authenticated:
+        return HttpResponseRedirect(reverse('core:login'))
+    if not req.user.is_host:
+        return render(req, 'host/pages/import.html', {'error': 'Only hosts can import inventory'}, status=403)
+    if req.method != 'POST':
+        return render(req, 'host/pages/import.html')
+
+    importer = InventoryImporter(req.user)
+    try:
+        for kind in ("venues", "turfs", "bookings"):
+            upload = req.FILES.get(kind)
+            if upload:
+                fmt = os.path.splitext(upload.name)[1].lstrip(".").lower()
+                getattr(importer, f"import_{kind}")(read_rows(upload, fmt))
+    except ValueError as e:
+        return render(req, 'host/pages/import.html', {'error': str(e), 'result': importer.result}, status=400)
+    return render(req, 'host/pages/import.html', {'result': importer.result})
@@ -89,3 +89,49 @@ LOGOUT_REDIRECT_URL = '/'
 
 RAZOR_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
 RAZOR_SECRET_KEY = os.getenv("RAZORPAY_KEY_SECRET")
+
+# Shared availability snapshot (see host/availability.py)
+AVAILABILITY_SNAPSHOT_PATH = os.getenv("AVAILABILITY_SNAPSHOT_PATH", BASE_DIR / "availability.snapshot")
+AVAILABILITY_SNAPSHOT_DAYS = 30
+AVAILABILITY_SNAPSHOT_MAX_AGE = 15 * 60  # seconds before readers stop trusting a build
+AVAILABILITY_SNAPSHOT_RECHECK = 1.0  # seconds between checks for a swapped-in file
+AVAILABILITY_MAX_AGE = 15  # Cache-Control max-age on availability JSON, revalidated by ETag after that
+NEXT_AVAILABLE_DAYS = 14  # how far ahead the per-turf "next free slot" summary looks
+TONIGHT_START_HOUR = 18
+
+# Booking API admission control (see api/admission.py)
+BOOKING_USER_RATE = 5 / 60  # tokens per second
+BOOKING_USER_BURST = 5
+BOOKING_IP_RATE = 20 / 60
+BOOKING_IP_BURST = 20
+BOOKING_TURF_CONCURRENCY = 4  # booking requests in flight per turf
+BOOKING_INFLIGHT_TTL = 60  # seconds before a leaked in-flight count resets
+BOOKING_TRUST_X_FORWARDED_FOR = os.getenv("BOOKING_TRUST_X_FORWARDED_FOR", "") == "1"
+
+# Admission control needs an in-memory cache shared by every worker (Redis, set
+# REDIS_URL; needs the redis package). Without one each process keeps its own
+# buckets and a warning is logged at startup. Never point this at a DB-backed
+# cache: the point is to reject requests before they touch the database.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+BOOKING_ADMISSION_CACHE = "default" if os.getenv("REDIS_URL") else None
+
+# Background jobs (see core/jobs.py, run with `manage.py run_jobs`)
+JOB_BATCH_SIZE = 50
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF = 30  # seconds, doubled on every retry
+JOB_STALE_TIMEOUT = 10 * 60  # seconds a job may stay RUNNING before it is requeued
+
+# Admin changelists show the planner's estimate instead of COUNT(*) above this many rows (PostgreSQL only)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
+
+# Append-only analytics event log (see core/events.py, exported with `manage.py export_events`)
+EVENT_LOG_DIR = os.getenv("EVENT_LOG_DIR", BASE_DIR / "events")
+EVENT_LOG_BATCH_SIZE = 200
+EVENT_LOG_FLUSH_INTERVAL = 5  # seconds
+EVENT_LOG_MAX_BUFFER = 50000  # events kept in memory while EVENT_LOG_DIR is unwritable
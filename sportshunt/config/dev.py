@@ -9,4 +9,5 @@ DATABASES = {
     }
 }
 STATIC_URL = "static/"
-WSGI_APPLICATION = "sportshunt.wsgi.application"
\ No newline at end of file
+WSGI_APPLICATION = "sportshunt.wsgi.application"
+EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"